@@ -14,6 +14,9 @@ Usage:
     python main.py "What are the best coffee shops in San Francisco?"
     python main.py "Compare OpenAI vs Anthropic AI approaches"
     
+    # Batch mode - one query per line, run concurrently
+    python main.py --batch-file queries.txt --concurrency 4
+    
     # With requirements file
     python main.py --requirements requirements.txt
     python main.py --requirements requirements.pdf "Analyze these requirements"
@@ -21,49 +24,177 @@ Usage:
 """
 
 import asyncio
+import atexit
 import sys
 import logging
+import logging.handlers
 import os
 import argparse
-from datetime import datetime
+import queue
+import threading
+import time
 
 from langchain_core.messages import HumanMessage
 
 from deep_research_from_scratch.research_agent_full import agent
 
+# Size of the file write buffer and of the in-memory record buffer
+LOG_FILE_BUFFER_SIZE = 65536
+LOG_MEMORY_CAPACITY = 512
+# Seconds between forced flushes of buffered log records
+LOG_FLUSH_INTERVAL = 30.0
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a large buffer to batch syscalls.
+
+    ``StreamHandler.emit`` flushes after every record, which would defeat the
+    buffer, so ``flush`` is a no-op here; ``BatchFlushMemoryHandler`` calls
+    ``flush_stream`` once after writing out each batch. Closing the handler
+    still flushes the stream.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self):
+        """Skip the per-record flush issued by ``emit``."""
+
+    def flush_stream(self):
+        """Flush the file buffer to disk."""
+        super().flush()
+
+class BatchFlushMemoryHandler(logging.handlers.MemoryHandler):
+    """Memory handler that flushes its file target once per drained batch."""
+
+    def flush(self):
+        """Write out the buffered records, then flush the target stream once."""
+        with self.lock:
+            super().flush()
+            if isinstance(self.target, BufferedFileHandler):
+                self.target.flush_stream()
+
+def _start_periodic_flush(handler: logging.Handler, interval: float) -> threading.Event:
+    """Flush a handler every `interval` seconds on a daemon thread.
+
+    Returns the event that stops the thread once set.
+    """
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            handler.flush()
+
+    threading.Thread(target=_run, name="log-flush", daemon=True).start()
+    return stop
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the seconds part of the timestamp between records."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the formatter with an empty per-thread timestamp cache."""
+        super().__init__(*args, **kwargs)
+        self._time_cache = threading.local()
+
+    def formatTime(self, record, datefmt=None):
+        """Format the record time, reformatting the seconds part only when it changes."""
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        int_sec = int(record.created)
+        cache = self._time_cache
+        if getattr(cache, "last_sec", None) != int_sec:
+            cache.last_sec = int_sec
+            cache.last_str = time.strftime(self.default_time_format, self.converter(int_sec))
+        return self.default_msec_format % (cache.last_str, record.msecs)
+
 # Configure logging
-def setup_logging():
-    """Set up logging configuration for the application."""
+def setup_logging(log_level: str = "INFO"):
+    """Set up logging configuration for the application.
+
+    Args:
+        log_level: Name of the minimum level to log (e.g. "INFO", "DEBUG")
+
+    Calling this more than once returns the already configured logger instead
+    of attaching a second set of handlers.
+    """
+    configured_logger = getattr(setup_logging, "_logger", None)
+    if configured_logger is not None:
+        return configured_logger
+    
+    # Resolve the level name once and reuse it everywhere below; unknown names fall back to INFO
+    level_num = logging.getLevelNamesMapping().get(log_level.upper())
+    if level_num is None:
+        print(f"Unknown log level {log_level!r}, using INFO", file=sys.stderr)
+        level_num = logging.INFO
+    
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
     
     # Generate timestamp for log file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
     log_filename = f"logs/deep_research_{timestamp}.log"
     
-    # Configure logging
+    # Build the real handlers; they are driven by a background listener thread.
+    # delay=True creates the log file on its first write, not when the handler is built.
+    # Caller information requires a stack walk per record, so only pay for it when debugging
+    if level_num == logging.DEBUG:
+        formatter = CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s')
+    else:
+        formatter = CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        logging._srcfile = None
+    # Records never need thread/process metadata; like _srcfile above, these
+    # flags are process-wide and also apply to loggers outside this app
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    file_handler = BufferedFileHandler(log_filename, delay=True)
+    file_handler.setFormatter(formatter)
+    # Coalesce file records in memory; errors are written out immediately
+    memory_handler = BatchFlushMemoryHandler(
+        capacity=LOG_MEMORY_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    flush_stop = _start_periodic_flush(memory_handler, LOG_FLUSH_INTERVAL)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    
+    # Route records through a queue so logging calls never block on disk/stdout I/O
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Only merge args into the message here; the listener's handlers apply the real format
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
     logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler(sys.stdout)
-        ]
+        level=level_num,
+        handlers=[queue_handler],
+        force=True
+    )
+    listener = logging.handlers.QueueListener(
+        log_queue, memory_handler, console_handler, respect_handler_level=True
     )
+    listener.start()
+    # atexit runs last-in first-out: stop the periodic flush, drain the queue,
+    # then flush and close the file
+    atexit.register(file_handler.close)
+    atexit.register(memory_handler.close)
+    atexit.register(listener.stop)
+    atexit.register(flush_stop.set)
     
     # Set specific loggers
-    logging.getLogger("deep_research").setLevel(logging.INFO)
+    logging.getLogger("deep_research").setLevel(level_num)
     logging.getLogger("ddgs").setLevel(logging.WARNING)  # Reduce DDGS noise
     logging.getLogger("httpx").setLevel(logging.WARNING)  # Reduce HTTP noise
     
-    return logging.getLogger("deep_research")
+    main_logger = logging.getLogger("deep_research")
+    main_logger._listener = listener
+    setup_logging._logger = main_logger
+    return main_logger
 
 # Initialize logger
-logger = setup_logging()
+logger = setup_logging(os.getenv("DEEP_RESEARCH_LOG_LEVEL", "INFO"))
 
-def print_banner():
-    """Print the application banner."""
-    banner = """
+BANNER = """
 # UI/UX Design Research Agent
 
 A comprehensive research system that uses multi-agent coordination
@@ -77,20 +208,26 @@ Features:
 - Automatic markdown file saving
 - Ollama integration for local AI processing
 """
-    print(banner)
 
-async def run_research(query: str) -> str:
+SEPARATOR = "=" * 80
+
+def print_banner():
+    """Print the application banner."""
+    print(BANNER)
+
+async def run_research(query: str, thread_id: str = "main") -> str:
     """
     Run the deep research agent on a given query.
     
     Args:
         query: The research question or topic
+        thread_id: Thread identifier for the agent run, unique per concurrent query
         
     Returns:
         The final research report
     """
-    logger.info(f"Starting research session for query: {query}")
-    start_time = datetime.now()
+    logger.info("Starting research session for query: %s", query)
+    start_time = time.monotonic()
     
     try:
         print(f"\nStarting research on: {query}")
@@ -100,31 +237,32 @@ async def run_research(query: str) -> str:
         # Run the full research agent
         result = await agent.ainvoke(
             {"messages": [HumanMessage(content=query)]},
-            config={"configurable": {"thread_id": "main", "recursion_limit": 50}}
+            config={"configurable": {"thread_id": thread_id, "recursion_limit": 50}}
         )
         
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        logger.info(f"Research completed successfully in {duration:.2f} seconds")
+        duration = time.monotonic() - start_time
+        logger.info("Research completed successfully in %.2f seconds", duration)
         
         final_report = result.get("final_report", "No report generated")
-        logger.info(f"Generated report length: {len(final_report)} characters")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Generated report length: %d characters", len(final_report))
         
         return final_report
         
     except Exception as e:
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        logger.error(f"Research failed after {duration:.2f} seconds: {str(e)}", exc_info=True)
+        duration = time.monotonic() - start_time
+        logger.error("Research failed after %.2f seconds: %s", duration, e, exc_info=True)
         print(f"Error during research: {str(e)}")
         return f"Error: {str(e)}"
 
-def save_markdown_report(report: str, query: str) -> str:
+def save_markdown_report(report: str, query: str, batch_index: int | None = None) -> str:
     """Save the research report as a markdown file.
     
     Args:
         report: The research report content
         query: The original query for filename generation
+        batch_index: Position of the query in a batch run, added to the filename
+            so reports saved in the same second never overwrite each other
         
     Returns:
         The path to the saved file
@@ -134,7 +272,6 @@ def save_markdown_report(report: str, query: str) -> str:
     
     # Generate filename from query (sanitize for filesystem)
     import re
-    from datetime import datetime
     
     # Clean query for filename
     clean_query = re.sub(r'[^\w\s-]', '', query.lower())
@@ -142,36 +279,39 @@ def save_markdown_report(report: str, query: str) -> str:
     clean_query = clean_query[:50]  # Limit length
     
     # Add timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"domain_knowledge/{clean_query}_{timestamp}.md"
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
+    if batch_index is None:
+        filename = f"domain_knowledge/{clean_query}_{timestamp}.md"
+    else:
+        filename = f"domain_knowledge/{clean_query}_{timestamp}_{batch_index}.md"
     
     # Save the report
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(report)
     
-    logger.info(f"Research report saved to: {filename}")
+    logger.info("Research report saved to: %s", filename)
     return filename
 
-def display_report(report: str, query: str = ""):
+def display_report(report: str, query: str = "", batch_index: int | None = None):
     """Display the research report in a formatted way and save it as markdown."""
     if report.startswith("Error:"):
         print(f"Error: {report}")
         return
         
-    print("\n" + "="*80)
+    print("\n" + SEPARATOR)
     print("UI/UX Design Research Report")
-    print("="*80)
+    print(SEPARATOR)
     
     # Display the report (plain text)
     print(report)
     
     # Save as markdown file
     if query:
-        saved_path = save_markdown_report(report, query)
-        print(f"\n" + "="*80)
+        saved_path = save_markdown_report(report, query, batch_index)
+        print("\n" + SEPARATOR)
         print(f"Report saved to: {saved_path}")
     
-    print("\n" + "="*80)
+    print("\n" + SEPARATOR)
     print("UI/UX Design Research completed successfully!")
 
 async def interactive_mode():
@@ -183,11 +323,11 @@ async def interactive_mode():
     
     while True:
         try:
-            # Get user input
-            query = input("\nEnter your research question (or 'quit' to exit): ")
+            # Get user input without blocking the event loop
+            query = await asyncio.to_thread(input, "\nEnter your research question (or 'quit' to exit): ")
             
             if query.lower() in ['quit', 'exit', 'q']:
-                logger.info(f"Interactive session ended. Total queries processed: {session_count}")
+                logger.info("Interactive session ended. Total queries processed: %d", session_count)
                 print("Goodbye!")
                 break
                 
@@ -196,18 +336,19 @@ async def interactive_mode():
                 continue
             
             session_count += 1
-            logger.info(f"Processing query #{session_count} in interactive mode")
+            logger.info("Processing query #%d in interactive mode", session_count)
             
             # Run research
             report = await run_research(query)
             display_report(report, query)
             
-        except KeyboardInterrupt:
-            logger.info(f"Interactive session interrupted. Total queries processed: {session_count}")
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # asyncio.Runner turns Ctrl-C into cancellation of the main task
+            logger.info("Interactive session interrupted. Total queries processed: %d", session_count)
             print("\nGoodbye!")
             break
         except Exception as e:
-            logger.error(f"Unexpected error in interactive mode: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in interactive mode: %s", e, exc_info=True)
             print(f"Unexpected error: {str(e)}")
 
 def read_requirements_file(file_path: str) -> str:
@@ -221,23 +362,43 @@ def read_requirements_file(file_path: str) -> str:
     file_ext = Path(file_path).suffix.lower()
     
     if file_ext == '.txt':
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        # Text mode keeps universal-newline translation so CRLF files reach the model as plain newlines
+        return Path(file_path).read_text(encoding='utf-8')
     elif file_ext == '.pdf':
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(file_path)
-            text = ""
-            for page_num in range(doc.page_count):                                                                                                                                                                                                                                                                                                                                                                                                                              
-                page = doc[page_num]
-                text += page.get_text() + "\n"
-            doc.close()
-            return text
         except ImportError:
             raise ImportError("PyMuPDF is required to read PDF files. Install it with: pip install PyMuPDF")
+        doc = fitz.open(file_path)
+        try:
+            pages = [page.get_text("text") for page in doc]
+        finally:
+            doc.close()
+        return "\n".join(pages)
     else:
         raise ValueError(f"Unsupported file format: {file_ext}. Supported formats: .txt, .pdf")
 
+async def run_batch(queries: list[str], concurrency: int = 4) -> list[str]:
+    """Run several research queries concurrently with a bounded number in flight.
+
+    Args:
+        queries: The research questions to run
+        concurrency: Maximum number of agent runs executing at the same time
+
+    Returns:
+        The final reports, in the same order as the input queries
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _bounded(index: int, query: str) -> str:
+        async with semaphore:
+            return await run_research(query, thread_id=f"main-{index}")
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(_bounded(i, query)) for i, query in enumerate(queries)]
+
+    return [task.result() for task in tasks]
+
 async def main():
     """Main entry point."""
     logger.info("Deep Research Agent starting up")
@@ -246,15 +407,34 @@ async def main():
     parser.add_argument("query", nargs="*", help="Research question or topic")
     parser.add_argument("--requirements", "-r", help="Path to requirements file (.txt or .pdf)")
     parser.add_argument("--interactive", "-i", action="store_true", help="Run in interactive mode")
+    parser.add_argument("--batch-file", "-b", help="Path to a text file with one research question per line")
+    parser.add_argument("--concurrency", "-c", type=int, default=4, help="Maximum concurrent queries in batch mode")
     
     args = parser.parse_args()
     
-    if args.requirements:                                                                                                                                                                                                       
+    if args.batch_file:
+        # Batch mode - run every query in the file concurrently
+        logger.info("Reading batch queries from file: %s", args.batch_file)
+        try:
+            with open(args.batch_file, 'r', encoding='utf-8') as f:
+                queries = [line.strip() for line in f if line.strip()]
+        except Exception as e:
+            logger.error("Error reading batch file: %s", e, exc_info=True)
+            print(f"Error reading batch file: {str(e)}")
+            sys.exit(1)
+
+        logger.info("Running %d queries in batch mode with concurrency %d", len(queries), args.concurrency)
+        print_banner()
+        reports = await run_batch(queries, concurrency=max(1, args.concurrency))
+        for i, (query, report) in enumerate(zip(queries, reports)):
+            display_report(report, query, batch_index=i)
+
+    elif args.requirements:                                                                                                                                                                                                       
         # Read requirements from file
-        logger.info(f"Reading requirements from file: {args.requirements}")
+        logger.info("Reading requirements from file: %s", args.requirements)
         try:
             requirements_content = read_requirements_file(args.requirements)
-            logger.info(f"Successfully read {len(requirements_content)} characters from requirements file")
+            logger.info("Successfully read %d characters from requirements file", len(requirements_content))
             
             # Combine requirements with query if provided
             if args.query:
@@ -267,14 +447,14 @@ async def main():
             display_report(report, query)
             
         except Exception as e:
-            logger.error(f"Error reading requirements file: {str(e)}", exc_info=True)
+            logger.error("Error reading requirements file: %s", e, exc_info=True)
             print(f"Error reading requirements file: {str(e)}")
             sys.exit(1)
             
     elif args.query:
         # Command line mode - single query
         query = " ".join(args.query)
-        logger.info(f"Running in command line mode with query: {query}")
+        logger.info("Running in command line mode with query: %s", query)
         print_banner()
         
         report = await run_research(query)
@@ -290,7 +470,14 @@ async def main():
 if __name__ == "__main__":
     # Ensure we're in an async context
     try:
-        asyncio.run(main())
+        # uvloop is an optional, POSIX-only speedup; fall back to the default loop
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            loop_factory = None
+        with asyncio.Runner(debug=False, loop_factory=loop_factory) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         print("\nGoodbye!")
     except Exception as e:
@@ -12,6 +12,7 @@ maintaining isolated context windows for each research topic.
 
 import asyncio
 import logging
+from functools import lru_cache
 
 from typing_extensions import Literal
 
@@ -19,21 +20,20 @@ from typing_extensions import Literal
 from langchain_core.messages import (
     HumanMessage, 
     BaseMessage, 
-    SystemMessage, 
     ToolMessage,
     filter_messages
 )
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
-from deep_research_from_scratch.prompts import lead_researcher_prompt
+from deep_research_from_scratch.prompts import lead_researcher_prompt, lead_researcher_prompt_continuation, lead_researcher_runtime_config
 from deep_research_from_scratch.research_agent import researcher_agent
 from deep_research_from_scratch.state_multi_agent_supervisor import (
     SupervisorState, 
     ConductResearch, 
     ResearchComplete
 )
-from deep_research_from_scratch.utils import get_today_str, think_tool, get_ollama_model
+from deep_research_from_scratch.utils import build_prompt_messages, get_runtime_context, think_tool, get_ollama_model
 
 # Set up logger for this module
 logger = logging.getLogger("deep_research.supervisor")
@@ -84,6 +84,15 @@ max_researcher_iterations = 15 # Calls to think_tool + ConductResearch (increase
 # This is passed to the lead_researcher_prompt to limit parallel research tasks
 max_concurrent_researchers = 5 # Increased for more parallel research
 
+@lru_cache(maxsize=32)
+def render_supervisor_system_message(max_concurrent: int, max_iterations: int, runtime_context: str, continuation: bool = False) -> str:
+    """Render the supervisor system message, memoized on its few scalar inputs."""
+    prompt = lead_researcher_prompt_continuation if continuation else lead_researcher_prompt
+    return prompt + lead_researcher_runtime_config.format(
+        max_concurrent_research_units=max_concurrent,
+        max_researcher_iterations=max_iterations
+    ) + runtime_context
+
 # ===== SUPERVISOR NODES =====
 
 async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tools"]]:
@@ -103,16 +112,15 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
     supervisor_messages = state.get("supervisor_messages", [])
     research_iterations = state.get("research_iterations", 0)
     
-    logger.info(f"Supervisor node executing - iteration {research_iterations + 1}")
-    logger.debug(f"Current supervisor state has {len(supervisor_messages)} messages")
-
-    # Prepare system message with current date and constraints
-    system_message = lead_researcher_prompt.format(
-        date=get_today_str(), 
-        max_concurrent_research_units=max_concurrent_researchers,
-        max_researcher_iterations=max_researcher_iterations
+    logger.info("Supervisor node executing - iteration %d", research_iterations + 1)
+    logger.debug("Current supervisor state has %d messages", len(supervisor_messages))
+
+    # Prepare system message: the full instructions on the first turn, the compact variant after
+    system_message = render_supervisor_system_message(
+        max_concurrent_researchers, max_researcher_iterations, get_runtime_context(),
+        continuation=research_iterations > 0
     )
-    messages = [SystemMessage(content=system_message)] + supervisor_messages
+    messages = build_prompt_messages(system_message, history=supervisor_messages)
 
     try:
         # Make decision about next research steps
@@ -122,7 +130,7 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
         # Log tool calls if any
         if hasattr(response, 'tool_calls') and response.tool_calls:
             tool_names = [tc['name'] for tc in response.tool_calls]
-            logger.info(f"Supervisor made {len(response.tool_calls)} tool calls: {tool_names}")
+            logger.info("Supervisor made %d tool calls: %s", len(response.tool_calls), tool_names)
         else:
             logger.info("Supervisor provided response without tool calls")
 
@@ -135,7 +143,7 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
         )
         
     except Exception as e:
-        logger.error(f"Error in supervisor node: {str(e)}", exc_info=True)
+        logger.error("Error in supervisor node: %s", e, exc_info=True)
         raise
 
 async def supervisor_tools(state: SupervisorState) -> Command[Literal["supervisor", "__end__"]]:
@@ -157,7 +165,7 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
     research_iterations = state.get("research_iterations", 0)
     most_recent_message = supervisor_messages[-1]
 
-    logger.info(f"Supervisor tools node executing - iteration {research_iterations}")
+    logger.info("Supervisor tools node executing - iteration %d", research_iterations)
 
     # Initialize variables for single return pattern
     tool_messages = []
@@ -208,7 +216,7 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
             if tool_call["name"] == "ConductResearch"
         ]
 
-        logger.info(f"Processing {len(think_tool_calls)} think_tool calls and {len(conduct_research_calls)} research calls")
+        logger.info("Processing %d think_tool calls and %d research calls", len(think_tool_calls), len(conduct_research_calls))
 
         # Handle think_tool calls (synchronous)
         for tool_call in think_tool_calls:
@@ -224,7 +232,7 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
         # Handle ConductResearch calls (asynchronous)
         if conduct_research_calls:
-            logger.info(f"Launching {len(conduct_research_calls)} parallel research agents")
+            logger.info("Launching %d parallel research agents", len(conduct_research_calls))
             
             # Launch parallel research agents
             coros = []
@@ -234,8 +242,9 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                     args = tool_call.get("args", {})
                     research_topic = args.get("research_topic", "Unknown research topic")
                     
-                    logger.debug(f"Tool call args: {args}")
-                    logger.debug(f"Research topic: {research_topic}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Tool call args: %s", args)
+                        logger.debug("Research topic: %s", research_topic)
                     
                     coros.append(
                         researcher_agent.ainvoke({
@@ -246,7 +255,7 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                         })
                     )
                 except Exception as e:
-                    logger.error(f"Error processing tool call {tool_call}: {str(e)}")
+                    logger.error("Error processing tool call %s: %s", tool_call, e)
                     # Create a fallback coroutine that returns an error result
                     async def error_result():
                         return {"compressed_research": f"Error processing research topic: {str(e)}", "raw_notes": []}
@@ -274,10 +283,10 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                 for result in tool_results
             ]
             
-            logger.info(f"Collected {len(all_raw_notes)} sets of raw notes from research agents")
+            logger.info("Collected %d sets of raw notes from research agents", len(all_raw_notes))
 
     except Exception as e:
-        logger.error(f"Error in supervisor tools: {str(e)}", exc_info=True)
+        logger.error("Error in supervisor tools: %s", e, exc_info=True)
         should_end = True
         next_step = END
 
@@ -5,6 +5,42 @@ including user clarification, domain research brief generation, domain knowledge
 and comprehensive domain knowledge base synthesis for UI design decision-making.
 """
 
+import hashlib
+import re
+import string
+from functools import cache
+
+
+class CompiledPrompt:
+    """A prompt template parsed once at import time.
+
+    ``str.format`` re-scans the whole template for placeholders on every call.
+    This splits the template into literal segments and field names up front so
+    rendering is a single join over the pre-parsed segments.
+    """
+
+    def __init__(self, template: str):
+        """Parse the template into (literal, field_name) segments.
+
+        Args:
+            template: A ``str.format`` template using only plain ``{name}`` fields
+        """
+        self.template = template
+        self._segments = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if format_spec or conversion:
+                raise ValueError(f"Unsupported placeholder in prompt template: {{{field_name}}}")
+            self._segments.append((literal, field_name))
+        self.field_names = frozenset(name for _, name in self._segments if name is not None)
+
+    def format(self, **kwargs) -> str:
+        """Render the template, equivalent to ``template.format(**kwargs)``."""
+        return "".join(
+            literal if field_name is None else literal + str(kwargs[field_name])
+            for literal, field_name in self._segments
+        )
+
+
 clarify_with_user_instructions="""
 These are the messages that have been exchanged so far from the user asking for UI/UX design research:
 <Messages>
@@ -57,17 +93,12 @@ For the verification message when no clarification is needed:
 transform_messages_into_research_topic_prompt = """You will be given a set of messages that have been exchanged so far between yourself and the user. 
 Your job is to automatically analyze these messages and translate them into a comprehensive UI/UX design research brief that will be used to guide UI/UX design pattern research.
 
-The messages that have been exchanged so far between yourself and the user are:
-<Messages>
-{messages}
-</Messages>
-
-Today's date is {date}.
+The messages are provided as the conversation following these instructions, and today's date is given in the final user message.
 
 CRITICAL: You must return ONLY a valid JSON object with the exact structure:
-{{
+{
   "research_brief": "Your comprehensive UI/UX design research brief here"
-}}
+}
 
 Do not include any additional text, explanations, or formatting outside the JSON object. The research_brief field should contain the complete research brief text.
 
@@ -127,7 +158,52 @@ Guidelines:
 **IMPORTANT:** Do not ask for clarification. Automatically analyze the user's request and create a comprehensive UI/UX design research brief based on your understanding of the domain and UI/UX context they've provided.
 """
 
-research_agent_prompt =  """You are a UI/UX design research assistant conducting comprehensive research on industry-specific UI/UX design patterns to build design knowledge bases for interface design. For context, today's date is {date}.
+transform_messages_into_research_topic_human_message = """Based on the conversation above, write the UI/UX design research brief as the JSON object described in your instructions."""
+
+# Design areas shared verbatim by the researcher and supervisor prompts
+uiux_research_areas = """- Industry-specific dashboard design patterns and layouts
+- Real-time monitoring interface designs and components
+- Data visualization patterns, charts, and graphs
+- Alert and notification system designs
+- Control panel and operator interface layouts
+- Mobile and responsive design considerations
+- User experience flows and interaction patterns
+- Visual design systems and component libraries
+- Accessibility and usability considerations
+- Industry-specific design standards and guidelines
+- Case studies and examples of successful interfaces in the domain
+- Design tools and technologies commonly used
+- Color schemes and visual design patterns
+- Typography and text design patterns
+- Iconography and symbol design
+- Navigation patterns and information architecture
+- Error handling and edge case design patterns
+- Performance and loading state designs
+- Form design and data entry patterns
+- Search and filtering interface patterns
+- Export and reporting interface designs
+- Multi-device and cross-platform considerations
+- Internationalization and localization patterns
+- Security and authentication interface designs
+- Help and documentation interface patterns
+- Onboarding and user guidance designs"""
+
+# Reflection question asked verbatim by both the researcher and supervisor think_tool protocols
+uiux_reflection_questions = """- What aspects of the interface design are still missing?"""
+
+# Citation numbering rules shared by the compression and final report prompts
+citation_numbering_rules = """- Assign each unique URL a single citation number in your text
+- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) regardless of which sources you choose"""
+
+# Shared fragments by stable ID, so every prompt embeds byte-identical text;
+# bump the version suffix when text changes
+PROMPT_FRAGMENTS = {
+    "uiux_research_areas_v1": uiux_research_areas,
+    "uiux_reflection_questions_v2": uiux_reflection_questions,
+    "citation_numbering_rules_v1": citation_numbering_rules,
+}
+
+research_agent_prompt = """You are a UI/UX design research assistant conducting comprehensive research on industry-specific UI/UX design patterns to build design knowledge bases for interface design. Today's date is given at the end of these instructions.
 
 <Task>
 Your job is to use tools to gather comprehensive UI/UX design patterns and interface examples for the user's specified industry/domain.
@@ -144,21 +220,7 @@ You have access to two main tools:
 
 <UI/UX Design Research Focus>
 Your research should comprehensively cover:
-- Industry-specific dashboard design patterns and layouts
-- Real-time monitoring interface designs and components
-- Data visualization patterns, charts, and graphs used in the industry
-- Alert and notification system designs
-- Control panel and operator interface layouts
-- Mobile and responsive design considerations for the industry
-- User experience flows and interaction patterns
-- Visual design systems and component libraries
-- Accessibility and usability considerations for the domain
-- Industry-specific design standards and guidelines
-- Case studies and examples of successful interfaces in the domain
-- Design tools and technologies commonly used
-- Color schemes, typography, and visual design patterns
-- Navigation patterns and information architecture
-- Error handling and edge case design patterns
+""" + PROMPT_FRAGMENTS["uiux_research_areas_v1"] + """
 </UI/UX Design Research Focus>
 
 <Instructions>
@@ -170,53 +232,17 @@ Think like a UI/UX design researcher building comprehensive design pattern knowl
 4. **Execute targeted searches for specific design aspects** - Fill in dashboard, visualization, and interaction pattern gaps
 5. **Stop when you have comprehensive UI/UX design coverage** - Don't keep searching for perfection
 
-**Comprehensive Search Strategy for UI/UX Design Patterns**:
-- Begin with industry-specific dashboard design examples and case studies
-- Research real-time monitoring interface patterns and live data displays
-- Investigate data visualization and charting patterns extensively
-- Explore alert and notification system designs and warning patterns
-- Study control panel and operator interface layouts in detail
-- Gather information on mobile and responsive design patterns
-- Research user experience flows and interaction patterns thoroughly
-- Study visual design systems and component libraries extensively
-- Research accessibility and usability considerations comprehensively
-- Find case studies and successful interface examples from multiple sources
-- Search for design guidelines and best practices
-- Research color schemes and visual design patterns
-- Investigate typography and text design patterns
-- Study iconography and symbol design systems
-- Research navigation patterns and information architecture
-- Explore error handling and edge case design patterns
-- Study performance and loading state designs
-- Research form design and data entry patterns
-- Investigate search and filtering interface patterns
-- Study export and reporting interface designs
-- Research multi-device and cross-platform considerations
-- Find internationalization and localization patterns
-- Study security and authentication interface designs
-- Research help and documentation interface patterns
-- Investigate onboarding and user guidance designs
+**Comprehensive Search Strategy for UI/UX Design Patterns**: Cover every area listed in <UI/UX Design Research Focus> above, starting broad with industry-specific dashboard examples and case studies, then narrowing to the specific areas that still have gaps.
 </Instructions>
 
 <Hard Limits>
-**Tool Call Budgets** (Comprehensive research approach):
-- **Simple UI/UX queries**: Use 8-12 search tool calls for thorough coverage
-- **Complex UI/UX design research**: Use up to 15-20 search tool calls maximum
-- **Always be thorough**: Research multiple aspects of UI/UX design patterns extensively
-- **Only stop**: After 20 search tool calls if you cannot find comprehensive UI/UX design patterns
-
-**Stop Only When**:
-- You have comprehensive UI/UX design patterns covering ALL key aspects thoroughly
-- You have 10+ authoritative design sources covering different design dimensions
-- You have researched multiple perspectives, case studies, and design examples
-- You can provide a complete, detailed UI/UX design knowledge base for interface design decisions
-- You have covered dashboard layouts, data visualization, alerts, mobile design, accessibility, and more
+**Tool Call Budget**: 8-12 search tool calls for simple queries, up to 20 for complex ones. Stop when you have 10+ authoritative sources covering dashboard layouts, data visualization, alerts, mobile design, accessibility, and domain-specific standards.
 </Hard Limits>
 
 <Show Your Thinking>
 After each search tool call, use think_tool to analyze the results:
 - What UI/UX design patterns did I find?
-- What aspects of the interface design are still missing?
+""" + PROMPT_FRAGMENTS["uiux_reflection_questions_v2"] + """
 - Do I have enough information to build a comprehensive UI/UX design knowledge base?
 - Should I search more or compile the design patterns I have?
 </Show Your Thinking>
@@ -224,11 +250,7 @@ After each search tool call, use think_tool to analyze the results:
 
 summarize_webpage_prompt = """You are tasked with summarizing the raw content of a webpage retrieved from a web search. Your goal is to create a summary that preserves the most important information from the original web page. This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
 
-Here is the raw content of the webpage:
-
-<webpage_content>
-{webpage_content}
-</webpage_content>
+The raw content of the webpage is provided in the <webpage_content> block of the user message.
 
 Please follow these guidelines to create your summary:
 
@@ -248,57 +270,66 @@ When handling different types of content:
 - For product pages: Keep key features, specifications, and unique selling points.
 
 Your summary should be significantly shorter than the original content but comprehensive enough to stand alone as a source of information. Aim for about 25-30 percent of the original length, unless the content is already concise.
+"""
 
-Present your summary in the following format:
-
-```
-{{
-   "summary": "Your summary here, structured with appropriate paragraphs or bullet points as needed",
-   "key_excerpts": "First important quote or excerpt, Second important quote or excerpt, Third important quote or excerpt, ...Add more excerpts as needed, up to a maximum of 5"
-}}
-```
-
-Here are two examples of good summaries:
-
-Example 1 (for a news article):
-```json
-{{
-   "summary": "On July 15, 2023, NASA successfully launched the Artemis II mission from Kennedy Space Center. This marks the first crewed mission to the Moon since Apollo 17 in 1972. The four-person crew, led by Commander Jane Smith, will orbit the Moon for 10 days before returning to Earth. This mission is a crucial step in NASA's plans to establish a permanent human presence on the Moon by 2030.",
-   "key_excerpts": "Artemis II represents a new era in space exploration, said NASA Administrator John Doe. The mission will test critical systems for future long-duration stays on the Moon, explained Lead Engineer Sarah Johnson. We're not just going back to the Moon, we're going forward to the Moon, Commander Jane Smith stated during the pre-launch press conference."
-}}
-```
+# Output format for plain-text calls; structured output calls get it from the Summary schema instead
+_summarize_webpage_json_format = """
+Return a JSON object with this schema: {"summary": str, "key_excerpts": str}
+- summary: the summary, structured with paragraphs or bullet points as needed
+- key_excerpts: up to 5 important quotes or excerpts, comma separated
+"""
 
-Example 2 (for a scientific article):
+summarize_webpage_example = """
+Example:
 ```json
-{{
-   "summary": "A new study published in Nature Climate Change reveals that global sea levels are rising faster than previously thought. Researchers analyzed satellite data from 1993 to 2022 and found that the rate of sea-level rise has accelerated by 0.08 mm/year² over the past three decades. This acceleration is primarily attributed to melting ice sheets in Greenland and Antarctica. The study projects that if current trends continue, global sea levels could rise by up to 2 meters by 2100, posing significant risks to coastal communities worldwide.",
-   "key_excerpts": "Our findings indicate a clear acceleration in sea-level rise, which has significant implications for coastal planning and adaptation strategies, lead author Dr. Emily Brown stated. The rate of ice sheet melt in Greenland and Antarctica has tripled since the 1990s, the study reports. Without immediate and substantial reductions in greenhouse gas emissions, we are looking at potentially catastrophic sea-level rise by the end of this century, warned co-author Professor Michael Green."  
-}}
+{
+   "summary": "On July 15, 2023, NASA launched the Artemis II mission from Kennedy Space Center, the first crewed mission to the Moon since Apollo 17 in 1972. The four-person crew will orbit the Moon for 10 days before returning to Earth.",
+   "key_excerpts": "Artemis II represents a new era in space exploration, said NASA Administrator John Doe. The mission will test critical systems for future long-duration stays on the Moon, explained Lead Engineer Sarah Johnson."
+}
 ```
+"""
 
+_summarize_webpage_closing = """
 Remember, your goal is to create a summary that can be easily understood and utilized by a downstream research agent while preserving the most critical information from the original webpage.
-
-Today's date is {date}.
 """
 
+# Schema-free variant for structured output calls; for plain-text calls, a full variant with
+# a few-shot example and a schema-only variant once the model is warmed up
+summarize_webpage_prompt_structured = summarize_webpage_prompt + _summarize_webpage_closing
+summarize_webpage_prompt_lean = summarize_webpage_prompt + _summarize_webpage_json_format + _summarize_webpage_closing
+summarize_webpage_prompt = summarize_webpage_prompt + _summarize_webpage_json_format + summarize_webpage_example + _summarize_webpage_closing
 
+summarize_webpage_human_message = """<webpage_content>
+{webpage_content}
+</webpage_content>"""
 
-lead_researcher_prompt = """You are a UI/UX design research supervisor. Your job is to coordinate comprehensive UI/UX design pattern research by calling the "ConductResearch" tool. For context, today's date is {date}.
-
-<Task>
-Your focus is to call the "ConductResearch" tool to conduct comprehensive UI/UX design pattern research against the overall UI/UX design research brief passed in by the user. 
-When you are completely satisfied with the UI/UX design pattern findings returned from the tool calls, then you should call the "ResearchComplete" tool to indicate that you are done with your UI/UX design research.
-</Task>
-
-<Available Tools>
+# Tool and budget sections shared by the full supervisor prompt and its continuation variant
+_lead_researcher_tools = """<Available Tools>
 You have access to three main tools:
 1. **ConductResearch**: Delegate UI/UX design research tasks to specialized sub-agents
 2. **ResearchComplete**: Indicate that UI/UX design research is complete
 3. **think_tool**: For reflection and strategic planning during UI/UX design research
 
 **CRITICAL: Use think_tool before calling ConductResearch to plan your UI/UX design research approach, and after each ConductResearch to assess progress**
-**PARALLEL UI/UX DESIGN RESEARCH**: When you identify multiple independent UI/UX design areas that can be explored simultaneously, make multiple ConductResearch tool calls in a single response to enable parallel research execution. This is more efficient than sequential research for comprehensive UI/UX design pattern building. Use at most {max_concurrent_research_units} parallel agents per iteration.
-</Available Tools>
+**PARALLEL UI/UX DESIGN RESEARCH**: When you identify multiple independent UI/UX design areas that can be explored simultaneously, make multiple ConductResearch tool calls in a single response to enable parallel research execution. This is more efficient than sequential research for comprehensive UI/UX design pattern building. Use at most max_concurrent_research_units parallel agents per iteration.
+</Available Tools>"""
+
+_lead_researcher_hard_limits = """<Hard Limits>
+**Task Delegation Budgets** (Comprehensive research approach):
+- **Bias towards exhaustive coverage** - Use multiple agents extensively when UI/UX design research requires different expertise areas
+- **Be thorough and comprehensive** - Delegate research across many different UI/UX design aspects
+- **Extensive tool calls** - Use up to max_researcher_iterations tool calls to think_tool and ConductResearch for comprehensive UI/UX design pattern coverage
+- **Multiple research rounds** - Conduct multiple rounds of research to ensure complete coverage
+</Hard Limits>"""
+
+lead_researcher_prompt = """You are a UI/UX design research supervisor. Your job is to coordinate comprehensive UI/UX design pattern research by calling the "ConductResearch" tool. Your research limits are given in the <Runtime Config> block and today's date at the end of these instructions.
+
+<Task>
+Your focus is to call the "ConductResearch" tool to conduct comprehensive UI/UX design pattern research against the overall UI/UX design research brief passed in by the user. 
+When you are completely satisfied with the UI/UX design pattern findings returned from the tool calls, then you should call the "ResearchComplete" tool to indicate that you are done with your UI/UX design research.
+</Task>
+
+""" + _lead_researcher_tools + """
 
 <UI/UX Design Research Strategy>
 Think like a thorough UI/UX design research manager building exhaustive design pattern understanding. Follow these steps:
@@ -309,39 +340,10 @@ Think like a thorough UI/UX design research manager building exhaustive design p
 4. **After each call to ConductResearch, pause and assess** - What design pattern gaps remain? What additional areas need research?
 
 **Comprehensive UI/UX Design Areas to Research**:
-- Industry-specific dashboard design patterns and layouts
-- Real-time monitoring interface designs and components
-- Data visualization patterns, charts, and graphs
-- Alert and notification system designs
-- Control panel and operator interface layouts
-- Mobile and responsive design considerations
-- User experience flows and interaction patterns
-- Visual design systems and component libraries
-- Accessibility and usability considerations
-- Industry-specific design standards and guidelines
-- Color schemes and visual design patterns
-- Typography and text design patterns
-- Iconography and symbol design
-- Navigation patterns and information architecture
-- Error handling and edge case design patterns
-- Performance and loading state designs
-- Form design and data entry patterns
-- Search and filtering interface patterns
-- Export and reporting interface designs
-- Multi-device and cross-platform considerations
-- Internationalization and localization patterns
-- Security and authentication interface designs
-- Help and documentation interface patterns
-- Onboarding and user guidance designs
+""" + PROMPT_FRAGMENTS["uiux_research_areas_v1"] + """
 </UI/UX Design Research Strategy>
 
-<Hard Limits>
-**Task Delegation Budgets** (Comprehensive research approach):
-- **Bias towards exhaustive coverage** - Use multiple agents extensively when UI/UX design research requires different expertise areas
-- **Be thorough and comprehensive** - Delegate research across many different UI/UX design aspects
-- **Extensive tool calls** - Use up to {max_researcher_iterations} tool calls to think_tool and ConductResearch for comprehensive UI/UX design pattern coverage
-- **Multiple research rounds** - Conduct multiple rounds of research to ensure complete coverage
-</Hard Limits>
+""" + _lead_researcher_hard_limits + """
 
 <Show Your Thinking>
 Before you call ConductResearch tool call, use think_tool to plan your UI/UX design research approach:
@@ -351,45 +353,33 @@ Before you call ConductResearch tool call, use think_tool to plan your UI/UX des
 
 After each ConductResearch tool call, use think_tool to analyze the results:
 - What UI/UX design patterns did I gather?
-- What aspects of the interface design are still missing?
+""" + PROMPT_FRAGMENTS["uiux_reflection_questions_v2"] + """
 - What additional UI/UX design areas need research?
 - Have I covered all the comprehensive UI/UX design areas thoroughly?
 - Should I delegate more UI/UX design research across different aspects or call ResearchComplete?
 - Remember: Only call ResearchComplete when you have truly exhaustive coverage of UI/UX design patterns
-</Show Your Thinking>
+- BE THOROUGH: Don't stop research early - continue until you have exhaustive coverage
+</Show Your Thinking>"""
 
-<UI/UX Design Research Scaling Rules>
-**Simple UI/UX design overview** can use a single sub-agent:
-- *Example*: Research gas turbine dashboard design patterns → Use 1 sub-agent
+# Shorter supervisor prompt for turns after the first, once the plan is in the conversation
+lead_researcher_prompt_continuation = """You are a UI/UX design research supervisor continuing the research plan from earlier in this conversation. Your research limits are given in the <Runtime Config> block and today's date at the end of these instructions.
 
-**Complex UI/UX design research** should use multiple sub-agents for different design expertise areas:
-- *Example*: Research gas turbine dashboard UI/UX patterns (real-time monitoring, data visualization, alerts, control panels) → Use 3-4 sub-agents
-- Delegate clear, distinct, non-overlapping UI/UX design areas
+""" + _lead_researcher_tools + """
 
-**UI/UX Design Research Delegation Examples**:
-- Industry-specific dashboard design patterns and layouts
-- Real-time monitoring interface designs and components
-- Data visualization patterns, charts, and graphs
-- Alert and notification system designs
-- Control panel and operator interface layouts
-- Mobile and responsive design considerations
-- User experience flows and interaction patterns
-- Visual design systems and component libraries
+""" + _lead_researcher_hard_limits + """
 
-**Important Reminders:**
-- Each ConductResearch call spawns a dedicated UI/UX design research agent for that specific design area
-- A separate agent will write the final UI/UX design knowledge report - you just need to gather comprehensive design information
-- When calling ConductResearch, provide complete standalone UI/UX design research instructions - sub-agents can't see other agents' work
-- Do NOT use domain-specific acronyms or abbreviations in your research questions, be very clear and specific
-- Focus on building comprehensive UI/UX design patterns that will inform interface design decisions
-- BE THOROUGH: Don't stop research early - continue until you have exhaustive coverage
-- Use multiple rounds of research to ensure comprehensive coverage
-- Research from multiple angles and perspectives
-- Look for case studies, examples, best practices, and design guidelines
-- Consider both current trends and established patterns
-</UI/UX Design Research Scaling Rules>"""
+<Next Step>
+Use think_tool to assess the findings returned so far against the research brief. Then either delegate the remaining gaps with ConductResearch, giving each sub-agent complete standalone instructions without domain-specific acronyms, or call ResearchComplete when coverage is exhaustive.
+</Next Step>"""
 
-compress_research_system_prompt = """You are a research assistant that has conducted research on a topic by calling several tools and web searches. Your job is now to clean up the findings, but preserve all of the relevant statements and information that the researcher has gathered. For context, today's date is {date}.
+lead_researcher_runtime_config = """
+
+<Runtime Config>
+max_concurrent_research_units: {max_concurrent_research_units}
+max_researcher_iterations: {max_researcher_iterations}
+</Runtime Config>"""
+
+compress_research_system_prompt = """You are a research assistant that has conducted research on a topic by calling several tools and web searches. Your job is now to clean up the findings, but preserve all of the relevant statements and information that the researcher has gathered. Today's date is given at the end of the final user message.
 
 <Task>
 You need to clean up information gathered from tool calls and web searches in the existing messages.
@@ -412,25 +402,21 @@ The think_tool calls contain strategic reflections and decision-making notes tha
 1. Your output findings should be fully comprehensive and include ALL of the information and sources that the researcher has gathered from tool calls and web searches. It is expected that you repeat key information verbatim.
 2. This report can be as long as necessary to return ALL of the information that the researcher has gathered.
 3. In your report, you should return inline citations for each source that the researcher found.
-4. You should include a "Sources" section at the end of the report that lists all of the sources the researcher found with corresponding citations, cited against statements in the report.
+4. You should list all of the sources the researcher found in "sources", with citation numbers matching the inline citations in "findings".
 5. Make sure to include ALL of the sources that the researcher gathered in the report, and how they were used to answer the question!
 6. It's really important not to lose any sources. A later LLM will be used to merge this report with others, so having all of the sources is critical.
 </Guidelines>
 
 <Output Format>
-The report should be structured like this:
-**List of Queries and Tool Calls Made**
-**Fully Comprehensive Findings**
-**List of All Relevant Sources (with citations in the report)**
+Respond with a single JSON object of this shape:
+{"queries": ["..."], "findings": "...", "sources": [{"n": 1, "title": "...", "url": "..."}]}
+- "queries": every search query and tool call made
+- "findings": the fully comprehensive findings, with inline citations like [1]
+- "sources": every relevant source cited in "findings"
 </Output Format>
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+""" + PROMPT_FRAGMENTS["citation_numbering_rules_v1"] + """
 </Citation Rules>
 
 Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
@@ -452,21 +438,9 @@ CRITICAL REQUIREMENTS:
 
 The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
 
-final_report_generation_prompt = """Based on all the UI/UX design research conducted, create a comprehensive, well-structured UI/UX design knowledge base that will inform interface design decisions:
-<UI/UX Design Research Brief>
-{research_brief}
-</UI/UX Design Research Brief>
-
-CRITICAL: Make sure the UI/UX design knowledge base is written in the same language as the human messages!
-For example, if the user's messages are in English, then MAKE SURE you write your response in English. If the user's messages are in Chinese, then MAKE SURE you write your entire response in Chinese.
-This is critical. The user will only understand the UI/UX design knowledge if it is written in the same language as their input message.
-
-Today's date is {date}.
+_final_report_generation_head = """Based on all the UI/UX design research conducted, create a comprehensive, well-structured UI/UX design knowledge base that will inform interface design decisions. The research brief and the findings from the research that you conducted are provided in the user messages.
 
-Here are the UI/UX design findings from the research that you conducted:
-<Findings>
-{findings}
-</Findings>
+CRITICAL: Write the knowledge base in the same language as the user's messages, translating the brief and findings if needed.
 
 Please create a comprehensive UI/UX design knowledge base that:
 1. Is well-organized with proper headings (# for title, ## for sections, ### for subsections)
@@ -491,33 +465,9 @@ For comprehensive UI/UX design pattern research, structure your report like this
 11/ **Accessibility & Usability** - Design for accessibility, usability considerations, and inclusive design patterns
 12/ **Design Tools & Technologies** - Recommended tools, frameworks, and implementation considerations
 
-**Alternative structures for specific interface types:**
-
-For **industrial monitoring dashboards** (power plants, manufacturing):
-1/ Industry context and operational requirements
-2/ Real-time monitoring interface patterns
-3/ Data visualization and charting patterns
-4/ Alert and notification system designs
-5/ Control panel and operator interface layouts
-6/ Mobile and responsive design considerations
-
-For **regulatory compliance interfaces** (pharmaceuticals, healthcare):
-1/ Compliance context and regulatory requirements
-2/ Data entry and validation interface patterns
-3/ Audit trail and documentation interfaces
-4/ User personas and workflow considerations
-5/ Accessibility and usability requirements
-6/ Technology and integration considerations
-
-For **analytics and reporting dashboards** (finance, business intelligence):
-1/ Business context and analytical requirements
-2/ Data visualization and charting patterns
-3/ Interactive filtering and drill-down interfaces
-4/ Report generation and export patterns
-5/ User personas and analytical workflows
-6/ Performance and scalability considerations
+"""
 
-REMEMBER: Section structure is flexible based on the specific interface type. You can structure your UI/UX design knowledge base however you think is best for the specific industry and interface type!
+_final_report_generation_tail = """REMEMBER: Section structure is flexible based on the specific interface type. You can structure your UI/UX design knowledge base however you think is best for the specific industry and interface type!
 Make sure that your sections are cohesive and provide comprehensive UI/UX design understanding for interface design decisions.
 
 For each section of the UI/UX design knowledge base, do the following:
@@ -529,16 +479,11 @@ For each section of the UI/UX design knowledge base, do the following:
 - Use bullet points to list out information when appropriate, but by default, write in paragraph form.
 - Focus on information that directly informs UI/UX design decisions and interface design considerations.
 
-REMEMBER:
-The brief and research may be in English, but you need to translate this information to the right language when writing the final UI/UX design knowledge base.
-Make sure the final UI/UX design knowledge base is in the SAME language as the human messages in the message history.
-
 Format the UI/UX design knowledge base in clear markdown with proper structure and include source references where appropriate.
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
+""" + PROMPT_FRAGMENTS["citation_numbering_rules_v1"] + """
 - End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
 - Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
 - Example format:
   [1] Source Title: URL
@@ -547,6 +492,71 @@ Format the UI/UX design knowledge base in clear markdown with proper structure a
 </Citation Rules>
 """
 
+# Alternative section layouts; only the one matching the research domain is sent
+final_report_alternative_structures = {
+    "industrial": """For **industrial monitoring dashboards** (power plants, manufacturing):
+1/ Industry context and operational requirements
+2/ Real-time monitoring interface patterns
+3/ Data visualization and charting patterns
+4/ Alert and notification system designs
+5/ Control panel and operator interface layouts
+6/ Mobile and responsive design considerations""",
+    "regulatory": """For **regulatory compliance interfaces** (pharmaceuticals, healthcare):
+1/ Compliance context and regulatory requirements
+2/ Data entry and validation interface patterns
+3/ Audit trail and documentation interfaces
+4/ User personas and workflow considerations
+5/ Accessibility and usability requirements
+6/ Technology and integration considerations""",
+    "analytics": """For **analytics and reporting dashboards** (finance, business intelligence):
+1/ Business context and analytical requirements
+2/ Data visualization and charting patterns
+3/ Interactive filtering and drill-down interfaces
+4/ Report generation and export patterns
+5/ User personas and analytical workflows
+6/ Performance and scalability considerations""",
+}
+
+# Domain-specific terms in the research brief that select each alternative layout;
+# generic UI/UX words like "dashboard" or "analytics" appear in most briefs and are left out
+final_report_domain_keywords = {
+    "industrial": ("power plant", "manufacturing", "turbine", "boiler", "scada", "process control", "plant operator"),
+    "regulatory": ("regulatory", "compliance", "pharmaceutical", "clinical", "audit trail", "fda", "gmp"),
+    "analytics": ("business intelligence", "finance", "financial", "revenue", "sales pipeline", "bi tool"),
+}
+
+@cache
+def render_final_report_prompt(domain_type: str | None = None) -> str:
+    """Assemble the final report system prompt for a research domain.
+
+    Args:
+        domain_type: Key of final_report_alternative_structures, or None to send
+            only the default section structure
+
+    Returns:
+        The static final report system prompt
+    """
+    if domain_type is None:
+        return _final_report_generation_head + _final_report_generation_tail
+    return (
+        _final_report_generation_head
+        + "**Alternative structure for this interface type:**\n\n"
+        + final_report_alternative_structures[domain_type]
+        + "\n\n"
+        + _final_report_generation_tail
+    )
+
+# The brief and the findings go in separate user messages so the brief stays a
+# stable prefix across retries of the same research run
+final_report_research_brief_message = """<UI/UX Design Research Brief>
+{research_brief}
+</UI/UX Design Research Brief>"""
+
+final_report_generation_human_message = """Here are the UI/UX design findings from the research that you conducted:
+<Findings>
+{findings}
+</Findings>"""
+
 BRIEF_CRITERIA_PROMPT = """
 <role>
 You are an expert research brief evaluator specializing in assessing whether generated research briefs accurately capture user-specified criteria without loss of important details.
@@ -675,6 +685,62 @@ Judgment: FAIL - assumes "modern", "safe", and "good schools" preferences
 Carefully scan the brief for any details not explicitly provided by the user. Be strict - when in doubt about whether something was user-specified, lean toward FAIL.
 </output_instructions>"""
 
+# ===== RUNTIME CONTEXT =====
+
+# The only per-day value in any prompt; appended after all static and per-call
+# content so it never breaks a cached prompt prefix
+runtime_context_prompt = """
+
+Today's date is {date}."""
+
+# ===== COMPILED TEMPLATES =====
+
+# Templates rendered on every agent call are pre-parsed once at import
+summarize_webpage_human_message = CompiledPrompt(summarize_webpage_human_message)
+lead_researcher_runtime_config = CompiledPrompt(lead_researcher_runtime_config)
+compress_research_human_message = CompiledPrompt(compress_research_human_message)
+final_report_research_brief_message = CompiledPrompt(final_report_research_brief_message)
+final_report_generation_human_message = CompiledPrompt(final_report_generation_human_message)
+runtime_context_prompt = CompiledPrompt(runtime_context_prompt)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def render_summarize_webpage_human_message(webpage_content: str) -> tuple[str, str]:
+    """Key webpage content by its normalized text and render the summarization user message.
+
+    Whitespace runs are collapsed for the key only, so pages that differ only in
+    spacing share a cache entry. The message keeps the original line structure
+    (lists, steps) that the summarization prompt asks the model to preserve.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+
+    Returns:
+        Tuple of (sha256 hex digest of the normalized content, rendered message)
+    """
+    normalized = _WHITESPACE_RE.sub(" ", webpage_content).strip()
+    content_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return content_hash, summarize_webpage_human_message.format(webpage_content=webpage_content.strip())
+
+def render_messages(messages) -> str:
+    """Serialize chat messages into a canonical transcript for text-only prompts.
+
+    Every prompt that embeds a conversation as text must build it with this
+    helper, so the same conversation always produces the same bytes: one
+    ``[type] content`` line per message, with no IDs, timestamps or
+    serializer-dependent whitespace.
+
+    Args:
+        messages: LangChain messages (anything with ``type`` and ``content``)
+
+    Returns:
+        The transcript, one message per line
+    """
+    return "\n".join(
+        f"[{m.type}] {(m.content if isinstance(m.content, str) else str(m.content)).strip()}"
+        for m in messages
+    )
+
 # ===== DOMAIN KNOWLEDGE SPECIFIC PROMPTS =====
 
 domain_knowledge_categorization_prompt = """You are a domain knowledge categorization specialist. Your job is to analyze domain knowledge content and categorize it into structured sections for optimal UI design decision-making.
@@ -6,15 +6,16 @@ and synthesis to answer complex research questions.
 """
 
 import logging
+from functools import lru_cache
 from pydantic import BaseModel, Field
 from typing_extensions import Literal
 
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
+from langchain_core.messages import ToolMessage, filter_messages
 
 
-from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
-from deep_research_from_scratch.utils import ddgs_search, get_today_str, think_tool, get_ollama_model
+from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState, CompressedResearch
+from deep_research_from_scratch.utils import build_prompt_messages, ddgs_search, get_runtime_context, think_tool, get_ollama_model
 from deep_research_from_scratch.prompts import research_agent_prompt, compress_research_system_prompt, compress_research_human_message
 
 # Set up logger for this module
@@ -31,6 +32,24 @@ model = get_ollama_model()
 model_with_tools = model.bind_tools(tools)
 summarization_model = get_ollama_model()
 compress_model = get_ollama_model(max_tokens=32000)
+structured_compress_model = compress_model.with_structured_output(CompressedResearch)
+
+# ===== HELPER FUNCTIONS =====
+
+@lru_cache(maxsize=8)
+def render_research_agent_system_message(runtime_context: str) -> str:
+    """Render the researcher system message, memoized on the runtime context."""
+    return research_agent_prompt + runtime_context
+
+def format_compressed_research(research: CompressedResearch) -> str:
+    """Render structured compressed research as the markdown report the supervisor consumes."""
+    queries = "\n".join(f"- {query}" for query in research.queries)
+    sources = "\n".join(f"[{source.n}] {source.title}: {source.url}" for source in research.sources)
+    return (
+        f"**List of Queries and Tool Calls Made**\n{queries}\n\n"
+        f"**Fully Comprehensive Findings**\n{research.findings}\n\n"
+        f"### Sources\n{sources}"
+    )
 
 # ===== AGENT NODES =====
 
@@ -44,16 +63,19 @@ def llm_call(state: ResearcherState):
     Returns updated state with the model's response.
     """
     logger.debug("LLM call node executing")
-    logger.debug(f"Current state has {len(state.get('researcher_messages', []))} messages")
+    logger.debug("Current state has %d messages", len(state.get('researcher_messages', [])))
     
     try:
         response = model_with_tools.invoke(
-            [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
+            build_prompt_messages(
+                render_research_agent_system_message(get_runtime_context()),
+                history=state["researcher_messages"]
+            )
         )
         
         # Log tool calls if any
         if hasattr(response, 'tool_calls') and response.tool_calls:
-            logger.info(f"LLM made {len(response.tool_calls)} tool calls: {[tc['name'] for tc in response.tool_calls]}")
+            logger.info("LLM made %d tool calls: %s", len(response.tool_calls), [tc['name'] for tc in response.tool_calls])
         else:
             logger.info("LLM provided final response without tool calls")
         
@@ -62,7 +84,7 @@ def llm_call(state: ResearcherState):
         }
         
     except Exception as e:
-        logger.error(f"Error in LLM call: {str(e)}", exc_info=True)
+        logger.error("Error in LLM call: %s", e, exc_info=True)
         raise
 
 def tool_node(state: ResearcherState):
@@ -72,21 +94,21 @@ def tool_node(state: ResearcherState):
     Returns updated state with tool execution results.
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
-    logger.info(f"Tool node executing {len(tool_calls)} tool calls")
+    logger.info("Tool node executing %d tool calls", len(tool_calls))
 
     # Execute all tool calls
     observations = []
     for i, tool_call in enumerate(tool_calls):
         tool_name = tool_call["name"]
-        logger.debug(f"Executing tool {i+1}/{len(tool_calls)}: {tool_name}")
+        logger.debug("Executing tool %d/%d: %s", i+1, len(tool_calls), tool_name)
         
         try:
             tool = tools_by_name[tool_name]
             observation = tool.invoke(tool_call["args"])
             observations.append(observation)
-            logger.debug(f"Tool {tool_name} completed successfully")
+            logger.debug("Tool %s completed successfully", tool_name)
         except Exception as e:
-            logger.error(f"Error executing tool {tool_name}: {str(e)}", exc_info=True)
+            logger.error("Error executing tool %s: %s", tool_name, e, exc_info=True)
             observations.append(f"Error executing {tool_name}: {str(e)}")
 
     # Create tool message outputs
@@ -98,7 +120,7 @@ def tool_node(state: ResearcherState):
         ) for observation, tool_call in zip(observations, tool_calls)
     ]
 
-    logger.info(f"Tool node completed. Generated {len(tool_outputs)} tool messages")
+    logger.info("Tool node completed. Generated %d tool messages", len(tool_outputs))
     return {"researcher_messages": tool_outputs}
 
 def compress_research(state: ResearcherState) -> dict:
@@ -108,14 +130,36 @@ def compress_research(state: ResearcherState) -> dict:
     a compressed summary suitable for the supervisor's decision-making.
     """
     logger.info("Starting research compression")
-    logger.debug(f"Compressing {len(state.get('researcher_messages', []))} messages")
+    logger.debug("Compressing %d messages", len(state.get('researcher_messages', [])))
 
     try:
-        system_message = compress_research_system_prompt.format(date=get_today_str())
-        messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
+        # The system prompt is identical for every researcher; only the trailing message varies
+        human_message = compress_research_human_message.format(
+            research_topic=state.get("research_topic", "")
+        ) + get_runtime_context()
+        messages = build_prompt_messages(
+            compress_research_system_prompt,
+            human_message,
+            history=state.get("researcher_messages", [])
+        )
         
-        logger.debug("Invoking compression model")
-        response = compress_model.invoke(messages)
+        try:
+            # Structured output constrains the model to the JSON envelope
+            logger.debug("Invoking compression model with structured output")
+            research = structured_compress_model.invoke(messages)
+        except Exception as structured_error:
+            logger.warning("Structured output failed for compression: %s", structured_error)
+            logger.info("Attempting fallback text generation with JSON parsing")
+            response = compress_model.invoke(messages)
+            try:
+                research = CompressedResearch.model_validate_json(str(response.content))
+            except ValueError:
+                # Keep the raw text rather than lose the findings
+                research = None
+                compressed_content = str(response.content)
+
+        if research is not None:
+            compressed_content = format_compressed_research(research)
 
         # Extract raw notes from tool and AI messages
         raw_notes = [
@@ -125,9 +169,8 @@ def compress_research(state: ResearcherState) -> dict:
             )
         ]
 
-        compressed_content = str(response.content)
-        logger.info(f"Research compression completed. Compressed content length: {len(compressed_content)} characters")
-        logger.debug(f"Extracted {len(raw_notes)} raw notes")
+        logger.info("Research compression completed. Compressed content length: %d characters", len(compressed_content))
+        logger.debug("Extracted %d raw notes", len(raw_notes))
 
         return {
             "compressed_research": compressed_content,
@@ -135,7 +178,7 @@ def compress_research(state: ResearcherState) -> dict:
         }
         
     except Exception as e:
-        logger.error(f"Error during research compression: {str(e)}", exc_info=True)
+        logger.error("Error during research compression: %s", e, exc_info=True)
         raise
 
 # ===== ROUTING LOGIC =====
@@ -11,12 +11,14 @@ The system orchestrates the complete domain knowledge research workflow from ini
 input through final domain knowledge base delivery for UI design decision-making.
 """
 
+import hashlib
 import logging
+import re
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.utils import get_today_str, get_ollama_model
-from deep_research_from_scratch.prompts import final_report_generation_prompt
+from deep_research_from_scratch.utils import build_prompt_messages, get_runtime_context, get_ollama_model
+from deep_research_from_scratch.prompts import final_report_domain_keywords, final_report_generation_human_message, final_report_research_brief_message, render_final_report_prompt
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import write_research_brief
 from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
@@ -30,6 +32,44 @@ writer_model = get_ollama_model(max_tokens=32000)
 
 # ===== FINAL REPORT GENERATION =====
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def deduplicate_notes(notes: list[str]) -> list[str]:
+    """Drop notes that repeat an earlier one up to whitespace and case, keeping the first."""
+    seen = set()
+    unique_notes = []
+    for note in notes:
+        normalized = _WHITESPACE_RE.sub(" ", note).strip().lower()
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique_notes.append(note)
+    return unique_notes
+
+# One whole-word pattern per keyword, allowing a plural "s"
+_DOMAIN_KEYWORD_PATTERNS = {
+    domain_type: [re.compile(rf"\b{re.escape(keyword)}s?\b") for keyword in keywords]
+    for domain_type, keywords in final_report_domain_keywords.items()
+}
+
+def infer_report_domain_type(research_brief: str) -> str | None:
+    """Pick the alternative report layout whose keywords best match the brief.
+
+    Returns:
+        A key of final_report_alternative_structures, or None if no keywords
+        match or several layouts match equally well
+    """
+    brief = research_brief.lower()
+    hits = {
+        domain_type: sum(1 for pattern in patterns if pattern.search(brief))
+        for domain_type, patterns in _DOMAIN_KEYWORD_PATTERNS.items()
+    }
+    best = max(hits.values())
+    if not best:
+        return None
+    leaders = [domain_type for domain_type, count in hits.items() if count == best]
+    return leaders[0] if len(leaders) == 1 else None
+
 async def final_report_generation(state: AgentState):
     """
     Final report generation node.
@@ -41,25 +81,35 @@ async def final_report_generation(state: AgentState):
     notes = state.get("notes", [])
     research_brief = state.get("research_brief", "")
     
-    logger.debug(f"Processing {len(notes)} research notes for final report")
-    logger.debug(f"Research brief length: {len(research_brief)} characters")
+    logger.debug("Processing %d research notes for final report", len(notes))
+    logger.debug("Research brief length: %d characters", len(research_brief))
 
     try:
-        findings = "\n".join(notes)
-        logger.debug(f"Combined findings length: {len(findings)} characters")
+        unique_notes = deduplicate_notes(notes)
+        logger.debug("Dropped %d duplicate research notes", len(notes) - len(unique_notes))
+
+        findings = "\n".join(unique_notes)
+        logger.debug("Combined findings length: %d characters", len(findings))
+
+        domain_type = infer_report_domain_type(research_brief)
+        logger.debug("Final report domain type: %s", domain_type)
 
-        final_report_prompt = final_report_generation_prompt.format(
-            research_brief=research_brief,
-            findings=findings,
-            date=get_today_str()
+        final_report_messages = build_prompt_messages(
+            render_final_report_prompt(domain_type),
+            final_report_generation_human_message.format(findings=findings) + get_runtime_context(),
+            history=[HumanMessage(content=final_report_research_brief_message.format(research_brief=research_brief))]
         )
 
-        logger.debug("Invoking writer model for final report generation")
-        final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+        # Stream so LangGraph stream consumers see tokens as they are generated
+        logger.debug("Streaming writer model output for final report generation")
+        report_chunks = []
+        async for chunk in writer_model.astream(final_report_messages):
+            if chunk.content:
+                report_chunks.append(chunk.content)
 
-        final_report_content = final_report.content
+        final_report_content = "".join(report_chunks)
         logger.info("Final report generated successfully")
-        logger.info(f"Final report length: {len(final_report_content)} characters")
+        logger.info("Final report length: %d characters", len(final_report_content))
 
         return {
             "final_report": final_report_content, 
@@ -67,7 +117,7 @@ async def final_report_generation(state: AgentState):
         }
         
     except Exception as e:
-        logger.error(f"Error in final report generation: {str(e)}", exc_info=True)
+        logger.error("Error in final report generation: %s", e, exc_info=True)
         error_report = f"Error generating final report: {str(e)}"
         return {
             "final_report": error_report, 
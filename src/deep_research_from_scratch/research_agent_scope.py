@@ -9,31 +9,100 @@ The workflow uses structured output to automatically infer domain context
 and create comprehensive research briefs for domain knowledge aggregation.
 """
 
+import hashlib
+import json
 import logging
+import os
+import threading
+from collections import OrderedDict
 
-
-from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
+from langchain_core.messages import HumanMessage, AIMessage
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.prompts import transform_messages_into_research_topic_prompt
+from deep_research_from_scratch.prompts import render_messages, transform_messages_into_research_topic_prompt, transform_messages_into_research_topic_human_message
 from deep_research_from_scratch.state_scope import AgentState, ResearchQuestion, AgentInputState
-from deep_research_from_scratch.utils import get_today_str, get_ollama_model
+from deep_research_from_scratch.utils import build_prompt_messages, get_env_int, get_today_str, get_runtime_context, get_ollama_model
 
 # Set up logger for this module
 logger = logging.getLogger("deep_research.scope")
 
+# Decoder for pulling the brief out of a plain-text model response; strict=False
+# tolerates raw newlines inside the brief string
+_BRIEF_DECODER = json.JSONDecoder(strict=False)
+
 # ===== UTILITY FUNCTIONS =====
 
+# Confirmation message for the user once the brief is ready
+_CONFIRMATION_MSG = AIMessage(content="I've analyzed your request and will now begin comprehensive UI/UX design research to build a knowledge base for your interface design project.")
+
+# Briefs keyed by a hash of the conversation and today's date, so replays and
+# retries of the same conversation skip the model call; least recently used evicted first.
+# The model runs at temperature 0, so an identical transcript yields the same brief; 0 disables caching
+_BRIEF_CACHE_MAX = get_env_int("DEEP_RESEARCH_BRIEF_CACHE_SIZE", 128)
+_BRIEF_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+def _brief_cache_key(messages_text: str) -> str:
+    """Hash the canonical conversation transcript together with today's date."""
+    digest = hashlib.blake2b(messages_text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{digest}:{get_today_str()}"
+
+def _extract_research_brief(raw_content: str) -> str:
+    """Find the first JSON object with a research_brief key in a model response.
+
+    Each candidate ``{`` is handed to ``raw_decode``, which parses one object in a
+    single forward pass and stops at its end, so nested braces and surrounding
+    prose or code fences are handled without regex scans.
+
+    Returns:
+        The brief, or an empty string if no such object is found
+    """
+    if '"research_brief"' not in raw_content:
+        return ""
+    index = raw_content.find('{')
+    while index >= 0:
+        try:
+            parsed_json, _ = _BRIEF_DECODER.raw_decode(raw_content, index)
+            if isinstance(parsed_json, dict) and "research_brief" in parsed_json:
+                return str(parsed_json["research_brief"])
+        except json.JSONDecodeError:
+            pass
+        index = raw_content.find('{', index + 1)
+    return ""
+
+def _brief_update(research_brief: str) -> dict:
+    """Build the state update that hands the brief to the supervisor."""
+    # Update state with generated research brief and pass it to the supervisor
+    return {
+        "research_brief": research_brief,
+        "supervisor_messages": [HumanMessage(content=f"{research_brief}.")],
+        # Shallow copy skips re-validation; a fresh object keeps the template's id unset
+        # so add_messages assigns each run its own id instead of replacing an earlier one
+        "messages": [_CONFIRMATION_MSG.model_copy()]
+    }
+
+def _remember_brief(cache_key: str, research_brief: str) -> dict:
+    """Cache a model-generated brief and build its state update."""
+    logger.debug("Research brief length: %d characters", len(research_brief))
+    logger.debug("Research brief preview: %.200s...", research_brief)
+
+    if _BRIEF_CACHE_MAX > 0:
+        _BRIEF_CACHE[cache_key] = research_brief
+        if len(_BRIEF_CACHE) > _BRIEF_CACHE_MAX:
+            _BRIEF_CACHE.popitem(last=False)
+
+    return _brief_update(research_brief)
+
 # ===== CONFIGURATION =====
 
 # Initialize model
 model = get_ollama_model(temperature=0.0)
+structured_output_model = model.with_structured_output(ResearchQuestion)
 
 # ===== WORKFLOW NODES =====
 
 
 
-def write_research_brief(state: AgentState):
+async def write_research_brief(state: AgentState):
     """
     Automatically analyze the user's request and transform it into a comprehensive domain knowledge research brief.
 
@@ -41,29 +110,37 @@ def write_research_brief(state: AgentState):
     and contains all necessary details for effective domain knowledge research.
     """
     logger.info("Starting automatic research brief generation")
-    logger.debug(f"Processing {len(state.get('messages', []))} messages for brief generation")
-
-    # Prepare the prompt
-    prompt_content = transform_messages_into_research_topic_prompt.format(
-        messages=get_buffer_string(state.get("messages", [])),
-        date=get_today_str()
+    logger.debug("Processing %d messages for brief generation", len(state.get("messages", [])))
+
+    # Serialize the conversation once; the cache key and the text fallback prompt both use it
+    messages_text = render_messages(state.get("messages", []))
+    cache_key = _brief_cache_key(messages_text)
+    cached_brief = _BRIEF_CACHE.get(cache_key)
+    if cached_brief is not None:
+        _BRIEF_CACHE.move_to_end(cache_key)
+        logger.info("Reusing cached research brief for an identical conversation")
+        return _brief_update(cached_brief)
+
+    # Prepare the prompt: static instructions, the conversation as native chat messages, then the date
+    prompt_messages = build_prompt_messages(
+        transform_messages_into_research_topic_prompt,
+        transform_messages_into_research_topic_human_message + get_runtime_context(),
+        history=state.get("messages", [])
     )
 
     # Try structured output first
     try:
         logger.debug("Attempting structured output generation")
-        structured_output_model = model.with_structured_output(ResearchQuestion)
-        response = structured_output_model.invoke([HumanMessage(content=prompt_content)])
-        research_brief = response.research_brief
+        response = await structured_output_model.ainvoke(prompt_messages)
         logger.info("Research brief generated successfully with structured output")
-        
+        return _remember_brief(cache_key, response.research_brief)
+
     except Exception as structured_error:
-        logger.warning(f"Structured output failed: {str(structured_error)}")
+        logger.warning("Structured output failed: %s", structured_error)
         logger.info("Attempting fallback text generation with manual JSON parsing")
         
         try:
             # Try with a simpler prompt first
-            messages_text = get_buffer_string(state.get("messages", []))
             simple_prompt = f"""Based on the following conversation, create a comprehensive UI/UX design research brief:
 
 {messages_text}
@@ -82,75 +159,30 @@ Return your response as a JSON object with this exact structure:
 
 Do not include any additional text outside the JSON object."""
 
-            response = model.invoke([HumanMessage(content=simple_prompt)])
+            response = await model.ainvoke([HumanMessage(content=simple_prompt)])
             raw_content = response.content.strip()
-            logger.debug(f"Raw model response: {raw_content[:500]}...")
-            
-            # Try to extract JSON from the response
-            import json
-            import re
-            
-            # Multiple approaches to extract JSON
-            research_brief = ""
-            
-            # Approach 1: Look for complete JSON object
-            json_match = re.search(r'\{[^{}]*"research_brief"[^{}]*\}', raw_content, re.DOTALL)
-            if json_match:
-                try:
-                    json_str = json_match.group(0)
-                    parsed_json = json.loads(json_str)
-                    research_brief = parsed_json.get("research_brief", "")
-                except:
-                    pass
+            logger.debug("Raw model response: %.500s...", raw_content)
+            if not raw_content:
+                raise ValueError("model returned an empty response")
             
-            # Approach 2: Look for JSON with code blocks
-            if not research_brief:
-                code_block_match = re.search(r'```(?:json)?\s*(\{.*?"research_brief".*?\})\s*```', raw_content, re.DOTALL)
-                if code_block_match:
-                    try:
-                        json_str = code_block_match.group(1)
-                        parsed_json = json.loads(json_str)
-                        research_brief = parsed_json.get("research_brief", "")
-                    except:
-                        pass
-            
-            # Approach 3: Look for any JSON-like structure
-            if not research_brief:
-                json_like_match = re.search(r'\{[^{}]*"research_brief"[^{}]*\}', raw_content, re.DOTALL)
-                if json_like_match:
-                    try:
-                        json_str = json_like_match.group(0)
-                        # Clean up common JSON issues
-                        json_str = json_str.replace('\n', ' ').replace('\r', ' ')
-                        parsed_json = json.loads(json_str)
-                        research_brief = parsed_json.get("research_brief", "")
-                    except:
-                        pass
-            
-            # Approach 4: If no JSON found, use the entire response as the brief
-            if not research_brief:
-                research_brief = raw_content
-                
-            logger.info("Research brief generated successfully with fallback parsing")
+            # Approach 1: Decode the first JSON object that carries the brief
+            research_brief = _extract_research_brief(raw_content)
+            if research_brief:
+                logger.info("Research brief generated successfully with fallback parsing")
+                return _remember_brief(cache_key, research_brief)
             
+            # Approach 2: If no JSON found, use the entire response as the brief.
+            # Don't cache it; the next identical request should get a chance to parse
+            logger.info("No JSON brief found, using the raw model response")
+            return _brief_update(raw_content)
+
         except Exception as fallback_error:
-            logger.error(f"Fallback parsing also failed: {str(fallback_error)}")
+            logger.error("Fallback parsing also failed: %s", fallback_error)
             # Final fallback
             research_brief = "I'll begin comprehensive UI/UX design research based on your request. Let me gather detailed information about the interface design patterns and user experience considerations for your specified domain."
             logger.info("Using final fallback research brief")
-
-    logger.debug(f"Research brief length: {len(research_brief)} characters")
-    logger.debug(f"Research brief preview: {research_brief[:200]}...")
-
-    # Create confirmation message for the user
-    confirmation_message = "I've analyzed your request and will now begin comprehensive UI/UX design research to build a knowledge base for your interface design project."
-
-    # Update state with generated research brief and pass it to the supervisor
-    return {
-        "research_brief": research_brief,
-        "supervisor_messages": [HumanMessage(content=f"{research_brief}.")],
-        "messages": [AIMessage(content=confirmation_message)]
-    }
+            # Don't cache the canned brief; the next identical request should try the model again
+            return _brief_update(research_brief)
 
 # ===== GRAPH CONSTRUCTION =====
 
@@ -166,3 +198,17 @@ deep_researcher_builder.add_edge("write_research_brief", END)
 
 # Compile the workflow
 scope_research = deep_researcher_builder.compile()
+
+# ===== MODEL PREWARM =====
+
+def _prewarm_model() -> None:
+    """Send a throwaway one-token request so the model is resident before the first brief."""
+    try:
+        get_ollama_model(max_tokens=1).invoke([HumanMessage(content="hi")])
+        logger.debug("Model prewarm completed")
+    except Exception as e:
+        logger.warning("Model prewarm failed: %s", e)
+
+# Opt-in so tests and CI don't pay for a model load on import
+if os.getenv("DEEP_RESEARCH_PREWARM") == "1":
+    threading.Thread(target=_prewarm_model, name="model-prewarm", daemon=True).start()
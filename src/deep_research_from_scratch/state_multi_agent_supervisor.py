@@ -35,7 +35,23 @@ class SupervisorState(TypedDict):
 
 @tool
 class ConductResearch(BaseModel):
-    """Tool for delegating a research task to a specialized sub-agent."""
+    """Tool for delegating a research task to a specialized sub-agent.
+
+    Each call spawns a dedicated UI/UX design research agent for one design area.
+    Sub-agents cannot see each other's work, and a separate agent writes the final report.
+
+    Scaling rules:
+    - A simple overview (e.g. gas turbine dashboard design patterns) needs a single sub-agent
+    - Complex research (e.g. gas turbine dashboards covering real-time monitoring, data
+      visualization, alerts and control panels) should use 3-4 sub-agents with clear,
+      distinct, non-overlapping design areas
+
+    When calling this tool:
+    - Provide complete standalone research instructions
+    - Do not use domain-specific acronyms or abbreviations; be very clear and specific
+    - Ask for case studies, examples, best practices and design guidelines, covering
+      both current trends and established patterns
+    """
     research_topic: str = Field(
         description="The topic to research. Should be a single topic, and should be described in high detail (at least a paragraph).",
     )
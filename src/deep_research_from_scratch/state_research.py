@@ -59,7 +59,25 @@ class ResearchQuestion(BaseModel):
         description="A research question that will be used to guide the research.",
     )
 
+class Source(BaseModel):
+    """Schema for a single cited source in compressed research."""
+    n: int = Field(description="Citation number used inline in the findings, e.g. 1 for [1]")
+    title: str = Field(description="Title of the source")
+    url: str = Field(description="URL of the source")
+
+class CompressedResearch(BaseModel):
+    """Schema for compressed research findings."""
+    queries: List[str] = Field(
+        description="List of all search queries and tool calls made during research",
+    )
+    findings: str = Field(
+        description="Fully comprehensive cleaned findings with inline [N] citations",
+    )
+    sources: List[Source] = Field(
+        description="All relevant sources, numbered sequentially to match the inline citations",
+    )
+
 class Summary(BaseModel):
     """Schema for webpage content summarization."""
-    summary: str = Field(description="Concise summary of the webpage content")
-    key_excerpts: str = Field(description="Important quotes and excerpts from the content")
+    summary: str = Field(description="Concise summary of the webpage content, structured with paragraphs or bullet points as needed")
+    key_excerpts: str = Field(description="Up to 5 important quotes or excerpts from the content, comma separated")
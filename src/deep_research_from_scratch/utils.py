@@ -5,28 +5,78 @@ This module provides search and content processing utilities for the research ag
 including web search capabilities and content summarization tools.
 """
 
+import hashlib
+import itertools
+import json
 import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from datetime import datetime
-from typing_extensions import Annotated, List, Literal
+from datetime import date
+from typing_extensions import Annotated, List, Literal, Sequence
+
+import httpx
 
 from langchain.chat_models import init_chat_model 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool, InjectedToolArg
 from ddgs import DDGS
 
 from deep_research_from_scratch.state_research import Summary
-from deep_research_from_scratch.prompts import summarize_webpage_prompt
+from deep_research_from_scratch.prompts import summarize_webpage_prompt, summarize_webpage_prompt_lean, summarize_webpage_prompt_structured, render_summarize_webpage_human_message, runtime_context_prompt
 
 # Set up logger for this module
 logger = logging.getLogger("deep_research.utils")
 
 # ===== UTILITY FUNCTIONS =====
 
+@lru_cache(maxsize=4)
+def _format_day(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%a %b %-d, %Y")
+
 def get_today_str() -> str:
-    """Get current date in a human-readable format."""
-    return datetime.now().strftime("%a %b %-d, %Y")
+    """Get current date in a human-readable format, formatted once per day."""
+    return _format_day(date.today().toordinal())
+
+@lru_cache(maxsize=8)
+def _render_runtime_context(date: str) -> str:
+    return runtime_context_prompt.format(date=date)
+
+def get_runtime_context() -> str:
+    """Get the runtime context suffix (today's date) appended after prompt content."""
+    return _render_runtime_context(get_today_str())
+
+def build_prompt_messages(
+    static_prompt: str,
+    dynamic_message: str | None = None,
+    history: Sequence[BaseMessage] | None = None,
+) -> List[BaseMessage]:
+    """Build the message list for a model call with a reusable prompt prefix.
+
+    The static instructions always go first as the system message, followed by
+    any conversation history, and the per-call content goes last as a human
+    message. Keeping this ordering in one place means every call site shares
+    the same cacheable prefix.
+
+    Args:
+        static_prompt: Instructions that are identical across calls
+        dynamic_message: Optional per-call content appended as the final message
+        history: Optional conversation messages placed between the two
+
+    Returns:
+        List of messages ready to pass to a chat model
+    """
+    messages: List[BaseMessage] = [SystemMessage(content=static_prompt)]
+    if history:
+        messages.extend(history)
+    if dynamic_message:
+        messages.append(HumanMessage(content=dynamic_message))
+    return messages
 
 def get_current_dir() -> Path:
     """Get the current directory of the module.
@@ -41,18 +91,113 @@ def get_current_dir() -> Path:
     except NameError:  # __file__ is not defined
         return Path.cwd()
 
+def get_env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or not an integer
+
+    Returns:
+        The parsed value, or the default with a logged warning if it is malformed
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Ignoring non-integer %s=%r, using %d", name, value, default)
+        return default
+
 # ===== CONFIGURATION =====
 
-def get_ollama_model(temperature: float = 0.0, max_tokens: int = None):
-    """Get a configured Ollama model instance."""
-    kwargs = {"model": "ollama:granite3.3:2b", "temperature": temperature}
+# Connection pool settings for each model's underlying Ollama HTTP client, sized
+# for the supervisor's concurrent researcher fan-out
+OLLAMA_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+# Keep the model and its KV cache resident between calls, and use one context size
+# for every instance: Ollama reloads the model whenever num_ctx changes between requests
+OLLAMA_KEEP_ALIVE = os.getenv("DEEP_RESEARCH_OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = get_env_int("DEEP_RESEARCH_OLLAMA_NUM_CTX", 16384)
+
+@lru_cache(maxsize=16)
+def _build_ollama_model(temperature: float, max_tokens: int | None):
+    kwargs = {
+        "model": "ollama:granite3.3:2b",
+        "temperature": temperature,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "num_ctx": OLLAMA_NUM_CTX,
+        "client_kwargs": {"limits": OLLAMA_HTTP_LIMITS},
+    }
     if max_tokens:
         kwargs["max_tokens"] = max_tokens
     return init_chat_model(**kwargs)
 
+def get_ollama_model(temperature: float = 0.0, max_tokens: int = None):
+    """Get a configured Ollama model instance, shared by every caller with the same settings."""
+    # Normalize to positional arguments so keyword and default calls share one cache entry
+    return _build_ollama_model(float(temperature), max_tokens or None)
+
 # Pre-configured model instances
 summarization_model = get_ollama_model()
-ddgs_client = DDGS()
+structured_summarization_model = summarization_model.with_structured_output(Summary)
+
+# DDGS keeps its HTTP session per instance and takes no shared session, so each
+# search worker thread gets its own client and reuses its connections across searches
+_ddgs_local = threading.local()
+
+def get_ddgs_client() -> DDGS:
+    """Get the DDGS client for the current thread, creating it on first use."""
+    client = getattr(_ddgs_local, "client", None)
+    if client is None:
+        client = _ddgs_local.client = DDGS()
+    return client
+
+# Upper bound on concurrent DDGS queries; the pool lives for the whole process so its
+# threads, and the DDGS clients they hold, outlive any single search
+SEARCH_MAX_WORKERS = 8
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="ddgs-search")
+
+# Results whose raw content is shorter than this are already snippet-sized and are
+# passed through as-is instead of being summarized; 0 summarizes everything
+SUMMARIZE_MIN_CHARS = get_env_int("DEEP_RESEARCH_SUMMARIZE_MIN_CHARS", 800)
+
+# Upper bound on concurrent summarization requests per search; keep it low enough
+# that the Ollama server can hold the parallel contexts in memory
+SUMMARIZE_MAX_WORKERS = get_env_int("DEEP_RESEARCH_SUMMARIZE_CONCURRENCY", 4)
+
+# Number of plain-text summarization calls per process that include the few-shot
+# example before switching to the shorter schema-only prompt; 0 never sends it
+SUMMARIZE_WARMUP_CALLS = get_env_int("DEEP_RESEARCH_SUMMARIZE_WARMUP_CALLS", 2)
+_summarize_call_counter = itertools.count()
+
+# Pages longer than this many characters keep only their head and tail before
+# summarization, which bounds prompt evaluation time and stays inside the context window
+SUMMARIZE_MAX_INPUT_CHARS = 8000
+
+# Flat JSON object with summary and key_excerpts keys in a plain-text summarization response
+_SUMMARY_JSON_PATTERN = re.compile(r'\{[^{}]*"summary"[^{}]*"key_excerpts"[^{}]*\}', re.DOTALL)
+
+# Summaries keyed by the sha256 of the normalized page content; the oldest
+# entry is evicted once the cache is full. Summarization runs on worker
+# threads, so every access goes through the lock
+SUMMARY_CACHE_SIZE = 256
+_summary_cache: "OrderedDict[str, str]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+def _get_cached_summary(content_hash: str) -> str | None:
+    with _summary_cache_lock:
+        return _summary_cache.get(content_hash)
+
+def _cache_summary(content_hash: str, summary: str) -> None:
+    with _summary_cache_lock:
+        _summary_cache[content_hash] = summary
+        if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+# Line closing each source block in formatted search output
+SOURCE_SEPARATOR = "-" * 80 + "\n"
 
 # ===== SEARCH FUNCTIONS =====
 
@@ -73,48 +218,51 @@ def ddgs_search_multiple(
     Returns:
         List of search result dictionaries
     """
-    logger.info(f"Starting DDGS search for {len(search_queries)} queries: {search_queries}")
-    
-    # Execute searches sequentially
-    search_docs = []
-    for i, query in enumerate(search_queries):
-        try:
-            logger.debug(f"Searching query {i+1}/{len(search_queries)}: {query}")
-            
-            # Use DDGS text search
-            results = list(ddgs_client.text(
-                query,
-                max_results=max_results,
-                region=region,
-                safesearch=safesearch
-            ))
-            
-            logger.debug(f"Found {len(results)} results for query: {query}")
-            
-            # Convert DDGS results to expected format
-            formatted_results = {
-                'results': []
-            }
-            
-            for result in results:
-                formatted_results['results'].append({
+    logger.info("Starting DDGS search for %d queries: %s", len(search_queries), search_queries)
+    if not search_queries:
+        return []
+
+    # Execute searches concurrently; map preserves the query order in the output
+    search_one = partial(_ddgs_search_one, max_results=max_results, region=region, safesearch=safesearch)
+    search_docs = list(_search_executor.map(search_one, search_queries))
+
+    total_results = sum(len(doc['results']) for doc in search_docs)
+    logger.info("DDGS search completed. Total results across all queries: %d", total_results)
+    return search_docs
+
+def _ddgs_search_one(query: str, max_results: int, region: str, safesearch: str) -> dict:
+    """Run a single DDGS text search and convert its results to the expected format."""
+    try:
+        logger.debug("Searching query: %s", query)
+
+        # Use DDGS text search, converting results as they arrive and stopping at max_results
+        results = get_ddgs_client().text(
+            query,
+            max_results=max_results,
+            region=region,
+            safesearch=safesearch
+        )
+
+        # Convert DDGS results to expected format
+        formatted_results = {
+            'results': [
+                {
                     'title': result.get('title', ''),
                     'url': result.get('href', ''),
                     'content': result.get('body', ''),
                     'raw_content': result.get('body', '')  # DDGS doesn't provide separate raw content
-                })
-            
-            search_docs.append(formatted_results)
-            logger.debug(f"Formatted {len(formatted_results['results'])} results for query: {query}")
-            
-        except Exception as e:
-            logger.error(f"Error searching for '{query}': {str(e)}", exc_info=True)
-            # Return empty results on error
-            search_docs.append({'results': []})
+                }
+                for result in itertools.islice(results, max_results)
+            ]
+        }
 
-    total_results = sum(len(doc['results']) for doc in search_docs)
-    logger.info(f"DDGS search completed. Total results across all queries: {total_results}")
-    return search_docs
+        logger.debug("Formatted %d results for query: %s", len(formatted_results['results']), query)
+        return formatted_results
+
+    except Exception as e:
+        logger.error("Error searching for '%s': %s", query, e, exc_info=True)
+        # Return empty results on error
+        return {'results': []}
 
 def summarize_webpage_content(webpage_content: str) -> str:
     """Summarize webpage content using the configured summarization model.
@@ -125,19 +273,27 @@ def summarize_webpage_content(webpage_content: str) -> str:
     Returns:
         Formatted summary with key excerpts
     """
-    logger.debug(f"Summarizing webpage content of length: {len(webpage_content)} characters")
-    
-    # Prepare the prompt
-    prompt_content = summarize_webpage_prompt.format(
-        webpage_content=webpage_content, 
-        date=get_today_str()
-    )
-    
+    logger.debug("Summarizing webpage content of length: %d characters", len(webpage_content))
+
+    if len(webpage_content) > SUMMARIZE_MAX_INPUT_CHARS:
+        half = SUMMARIZE_MAX_INPUT_CHARS // 2
+        logger.debug("Truncating webpage content from %d to %d characters", len(webpage_content), SUMMARIZE_MAX_INPUT_CHARS)
+        webpage_content = f"{webpage_content[:half]}\n...[truncated]...\n{webpage_content[-half:]}"
+
+    # Identical pages (up to whitespace) are summarized once per process
+    content_hash, human_message = render_summarize_webpage_human_message(webpage_content)
+    cached_summary = _get_cached_summary(content_hash)
+    if cached_summary is not None:
+        logger.debug("Using cached summary for content hash %.12s", content_hash)
+        return cached_summary
+
+    # Prepare the prompt: static instructions as the system message, the page as the user message
+    human_message += get_runtime_context()
+
     try:
-        # Try structured output first
+        # Try structured output first; the output format comes from the Summary schema
         logger.debug("Attempting structured output for summarization")
-        structured_model = summarization_model.with_structured_output(Summary)
-        summary = structured_model.invoke([HumanMessage(content=prompt_content)])
+        summary = structured_summarization_model.invoke(build_prompt_messages(summarize_webpage_prompt_structured, human_message))
 
         # Format summary with clear structure
         formatted_summary = (
@@ -145,25 +301,26 @@ def summarize_webpage_content(webpage_content: str) -> str:
             f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
         )
 
-        logger.debug(f"Successfully summarized content with structured output. Summary length: {len(formatted_summary)} characters")
+        logger.debug("Successfully summarized content with structured output. Summary length: %d characters", len(formatted_summary))
+        _cache_summary(content_hash, formatted_summary)
         return formatted_summary
 
     except Exception as structured_error:
-        logger.warning(f"Structured output failed for summarization: {str(structured_error)}")
+        logger.warning("Structured output failed for summarization: %s", structured_error)
         logger.info("Attempting fallback text generation with manual JSON parsing")
         
         try:
-            # Fallback: Use regular text generation and parse manually
-            response = summarization_model.invoke([HumanMessage(content=prompt_content)])
+            # Fallback: Use regular text generation with the JSON format spelled out, and parse manually
+            if next(_summarize_call_counter) < SUMMARIZE_WARMUP_CALLS:
+                system_prompt = summarize_webpage_prompt
+            else:
+                system_prompt = summarize_webpage_prompt_lean
+            response = summarization_model.invoke(build_prompt_messages(system_prompt, human_message))
             raw_content = response.content.strip()
-            logger.debug(f"Raw summarization response: {raw_content[:500]}...")
-            
-            # Try to extract JSON from the response
-            import json
-            import re
+            logger.debug("Raw summarization response: %.500s...", raw_content)
             
             # Look for JSON in the response
-            json_match = re.search(r'\{[^{}]*"summary"[^{}]*"key_excerpts"[^{}]*\}', raw_content, re.DOTALL)
+            json_match = _SUMMARY_JSON_PATTERN.search(raw_content)
             if json_match:
                 json_str = json_match.group(0)
                 parsed_json = json.loads(json_str)
@@ -178,19 +335,23 @@ def summarize_webpage_content(webpage_content: str) -> str:
                 formatted_summary = f"<summary>\n{raw_content}\n</summary>\n\n<key_excerpts>\nNo specific excerpts available\n</key_excerpts>"
                 
             logger.info("Successfully summarized content with fallback parsing")
-            logger.debug(f"Fallback summary length: {len(formatted_summary)} characters")
+            logger.debug("Fallback summary length: %d characters", len(formatted_summary))
+            _cache_summary(content_hash, formatted_summary)
             return formatted_summary
             
         except Exception as fallback_error:
-            logger.error(f"Fallback parsing also failed for summarization: {str(fallback_error)}")
+            logger.error("Fallback parsing also failed for summarization: %s", fallback_error)
             # Final fallback
             fallback_content = webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
             formatted_summary = f"<summary>\n{fallback_content}\n</summary>\n\n<key_excerpts>\nContent too long to extract specific excerpts\n</key_excerpts>"
-            logger.debug(f"Using final fallback content of length: {len(formatted_summary)} characters")
+            logger.debug("Using final fallback content of length: %d characters", len(formatted_summary))
             return formatted_summary
 
 def deduplicate_search_results(search_results: List[dict]) -> dict:
-    """Deduplicate search results by URL to avoid processing duplicate content.
+    """Deduplicate search results by URL and by body text to avoid processing duplicate content.
+
+    Mirrors and AMP pages often carry the same body under a different URL, so results
+    whose first 512 characters of raw content match an earlier result are dropped too.
 
     Args:
         search_results: List of search result dictionaries
@@ -199,12 +360,19 @@ def deduplicate_search_results(search_results: List[dict]) -> dict:
         Dictionary mapping URLs to unique results
     """
     unique_results = {}
-
-    for response in search_results:
-        for result in response['results']:
-            url = result['url']
-            if url not in unique_results:
-                unique_results[url] = result
+    seen_content_hashes: set[bytes] = set()
+
+    for result in itertools.chain.from_iterable(response['results'] for response in search_results):
+        url = result['url']
+        if url in unique_results:
+            continue
+        raw_content = result.get('raw_content')
+        if raw_content:
+            content_hash = hashlib.blake2b(raw_content[:512].encode("utf-8"), digest_size=8).digest()
+            if content_hash in seen_content_hashes:
+                continue
+            seen_content_hashes.add(content_hash)
+        unique_results[url] = result
 
     return unique_results
 
@@ -217,22 +385,29 @@ def process_search_results(unique_results: dict) -> dict:
     Returns:
         Dictionary of processed results with summaries
     """
-    summarized_results = {}
-
-    for url, result in unique_results.items():
-        # Use existing content if no raw content for summarization
-        if not result.get("raw_content"):
-            content = result['content']
-        else:
-            # Summarize raw content for better processing
-            content = summarize_webpage_content(result['raw_content'])
-
-        summarized_results[url] = {
-            'title': result['title'],
-            'content': content
-        }
-
-    return summarized_results
+    if not unique_results:
+        return {}
+
+    # Summarize concurrently; map preserves the input order of the results
+    max_workers = max(1, min(SUMMARIZE_MAX_WORKERS, len(unique_results)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(_summarize_result, unique_results.items()))
+
+def _summarize_result(item: tuple[str, dict]) -> tuple[str, dict]:
+    """Summarize a single search result, passing short results through unchanged."""
+    url, result = item
+    raw_content = result.get("raw_content") or ""
+    # Use existing content if the raw content is missing or too short to be worth summarizing
+    if len(raw_content) < max(SUMMARIZE_MIN_CHARS, 1):
+        content = result['content'] or raw_content
+    else:
+        # Summarize raw content for better processing
+        content = summarize_webpage_content(raw_content)
+
+    return url, {
+        'title': result['title'],
+        'content': content
+    }
 
 def format_search_output(summarized_results: dict) -> str:
     """Format search results into a well-structured string output.
@@ -246,15 +421,18 @@ def format_search_output(summarized_results: dict) -> str:
     if not summarized_results:
         return "No valid search results found. Please try different search queries or use a different search API."
 
-    formatted_output = "Search results: \n\n"
+    # Collect the sections and join once instead of growing one string per source
+    parts = ["Search results: \n\n"]
 
     for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_output += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
-        formatted_output += f"SUMMARY:\n{result['content']}\n\n"
-        formatted_output += "-" * 80 + "\n"
+        parts.append(
+            f"\n\n--- SOURCE {i}: {result['title']} ---\n"
+            f"URL: {url}\n\n"
+            f"SUMMARY:\n{result['content']}\n\n"
+        )
+        parts.append(SOURCE_SEPARATOR)
 
-    return formatted_output
+    return "".join(parts)
 
 # ===== RESEARCH TOOLS =====
 
@@ -276,7 +454,7 @@ def ddgs_search(
     Returns:
         Formatted string of search results with summaries
     """
-    logger.info(f"DDGS search tool called with query: '{query}', max_results: {max_results}")
+    logger.info("DDGS search tool called with query: '%s', max_results: %d", query, max_results)
     
     # Execute search for single query
     search_results = ddgs_search_multiple(
@@ -288,15 +466,15 @@ def ddgs_search(
 
     # Deduplicate results by URL to avoid processing duplicate content
     unique_results = deduplicate_search_results(search_results)
-    logger.debug(f"After deduplication: {len(unique_results)} unique results")
+    logger.debug("After deduplication: %d unique results", len(unique_results))
 
     # Process results with summarization
     summarized_results = process_search_results(unique_results)
-    logger.debug(f"After summarization: {len(summarized_results)} processed results")
+    logger.debug("After summarization: %d processed results", len(summarized_results))
 
     # Format output for consumption
     formatted_output = format_search_output(summarized_results)
-    logger.info(f"DDGS search tool completed. Output length: {len(formatted_output)} characters")
+    logger.info("DDGS search tool completed. Output length: %d characters", len(formatted_output))
     return formatted_output
 
 @tool(parse_docstring=True)
@@ -324,6 +502,7 @@ def think_tool(reflection: str) -> str:
     Returns:
         Confirmation that reflection was recorded for decision-making
     """
-    logger.debug(f"Think tool called with reflection of length: {len(reflection)} characters")
-    logger.debug(f"Reflection content: {reflection[:200]}...")  # Log first 200 chars
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Think tool called with reflection of length: %d characters", len(reflection))
+        logger.debug("Reflection content: %.200s...", reflection)  # Log first 200 chars
     return f"Reflection recorded: {reflection}"